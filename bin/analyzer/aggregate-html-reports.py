@@ -8,6 +8,9 @@ import plotly.graph_objects as go
 import plotly
 import matplotlib.pyplot as plt
 import time
+import json
+import throughput_model
+import workload_mix
 
 ANALYZER_PATH = "analyzer/"
 WORKLOAD_PATH = "workload/"
@@ -29,6 +32,10 @@ def convert():
     return time.strftime("%H hrs %M mins %S secs", time.gmtime(int(config.executiontime)))
 if __name__ == '__main__':
     config = load_args()
+    workload_config = workload_mix.load_workload_config()
+    objective_name, metric = workload_mix.get_objective(workload_config)
+    metric_column = 'gasPerSecond' if metric == workload_mix.METRIC_GAS else 'throughput'
+    unit = workload_mix.METRIC_UNITS[metric]
     my_tables = []
     for file in files:
         tables = pd.read_html(file)
@@ -53,6 +60,21 @@ if __name__ == '__main__':
         temp['blockInterval'] = temp['blockInterval'].astype(float)
         final = pd.concat([final, temp], ignore_index=False, sort=False)
 
+    # gas measured on the SUT, estimated with the configured gas per transaction for reports without measurement
+    measurements = {file.split('/')[-1]: workload_mix.load_measurement(file) for file in files}
+    final['gasPerSecond'] = [workload_mix.gas_per_second(workload_config, name, tps, measurements[file_name])
+                             for name, tps, file_name in zip(final['Name'], final['Throughput (TPS)'],
+                                                             final['fileName'])]
+    # throughput of every transaction type actually sent
+    types = []
+    for name, interval, gaslimit, tps, file_name in zip(final['Name'], final['blockInterval'], final['gasLimit'],
+                                                        final['Throughput (TPS)'], final['fileName']):
+        for operation, values in workload_mix.type_throughput(workload_config, name, tps,
+                                                              measurements[file_name]).items():
+            types.append([name, interval, gaslimit, operation, values[0], values[1]])
+    pd.DataFrame(types, columns=['Name', 'blockInterval', 'gasLimit', 'type', 'throughput', 'gasPerSecond']).to_csv(
+        resultsDir + 'data_types.csv', index=False)
+
     final = final.drop('Succ', axis=1).drop('Fail', axis=1).drop('Send Rate (TPS)', axis=1).drop(
         'Max Latency (s)', axis=1).drop(
         'Min Latency (s)', axis=1).drop('Avg Latency (s)', axis=1).drop('fileName', axis=1).drop('ExperimentNo',
@@ -80,14 +102,14 @@ if __name__ == '__main__':
     html = html.split('\n', 3)[3]
     #Create plots for Throughput analysis
     data = dat
-    data = data.loc[data['Name']=='transfer']
+    data = data.loc[data['Name']==objective_name]
     gaslimit = data['gasLimit'].values
     blockinterval = data['blockInterval'].values
-    tps = data['throughput'].values
+    tps = data[metric_column].values
     fig = go.Figure(data=[go.Scatter(
         x=gaslimit,
         y=blockinterval,
-        text=['TPS:'+str(s) for s in tps],
+        text=[unit+':'+str(s) for s in tps],
         mode='markers',
         marker=dict(
             size=tps,
@@ -103,7 +125,7 @@ if __name__ == '__main__':
     )
     plotly.offline.plot(fig, filename=resultsDir+'bubbleplot.html', auto_open=False)
     fig, ax = plt.subplots(1,1);
-    data.groupby("blockInterval").plot(x="gasLimit", y="throughput", ax=ax)
+    data.groupby("blockInterval").plot(x="gasLimit", y=metric_column, ax=ax)
     plt.xlabel('Gaslimit')
     plt.ylabel('Throughput')
     plt.legend([v[0] for v in data.groupby('blockInterval')['blockInterval']], title = 'Block interval')
@@ -122,7 +144,7 @@ if __name__ == '__main__':
     for x in blockInterval:
         temp=data.loc[data['blockInterval']==x]
         temp=temp.sort_values(by=['gasLimit'])
-        fig.add_trace(go.Scatter(x=list(temp.gasLimit),y=list(temp.throughput),name="Blockinterval"+str(x)))
+        fig.add_trace(go.Scatter(x=list(temp.gasLimit),y=list(temp[metric_column]),name="Blockinterval"+str(x)))
         temp1 = [False]*l
         temp1[blockInterval.index(x)] = True
         buttons.append(dict(label=str(x),
@@ -139,16 +161,45 @@ if __name__ == '__main__':
         ])
 
     fig.update_layout(title_text="All Blockintervals",xaxis_title="Gas Limit",
-    yaxis_title="Throughput")
+    yaxis_title="Throughput ("+unit+")")
 
     plotly.offline.plot(fig, filename=resultsDir+'linegraph.html',auto_open=False)
 
+    # Create fitted surfaces with the explored points overlaid
+    points = throughput_model.load_points(reportsDir, objective_name)
+    if metric == workload_mix.METRIC_GAS:
+        # the configured gas per transaction is only used for the reports without measured gas
+        points['throughput'] = points['gasPerSecond'].fillna(
+            points['throughput'] * workload_mix.gas_per_transaction(workload_config, objective_name))
+    for column, title, surface_unit in (('throughput', 'Throughput', unit), ('latency', 'Average latency', 's')):
+        # failed benchmarks have no latency
+        measured = points.dropna(subset=[column])
+        model = throughput_model.fit_surface(measured, column)
+        intervals, gaslimits, mean, std = throughput_model.predict_grid(model, measured)
+        fig = go.Figure()
+        fig.add_trace(go.Contour(x=gaslimits, y=intervals, z=mean, customdata=std, colorbar=dict(title=surface_unit),
+                                 name='Predicted',
+                                 hovertemplate='Gas limit: %{x}<br>Block interval: %{y}<br>' + title +
+                                               ': %{z:.2f} +/- %{customdata:.2f} ' + surface_unit + '<extra></extra>'))
+        fig.add_trace(go.Scatter(x=measured['gasLimit'], y=measured['blockInterval'], mode='markers',
+                                 name='Measured', marker=dict(color='white', line=dict(color='black', width=1)),
+                                 text=[title + ': ' + str(s) + ' ' + surface_unit for s in measured[column]]))
+        fig.update_layout(title=title + " surface fitted over gas limit and block interval",
+                          xaxis_title="Gas Limit", yaxis_title="Block Interval")
+        plotly.offline.plot(fig, filename=resultsDir + column + '-surface.html', auto_open=False)
+
+
+    # Save the optimal parameters, used as reference by the regression checks of next executions
+    with open(resultsDir + 'optimum.json', 'w') as f:
+        json.dump({'interval': int(config.interval), 'gaslimit': int(config.gaslimit),
+                   'throughput': float(config.throughput), 'round': objective_name, 'metric': metric}, f)
 
     # print(html)
     with open(html_result, "r+") as f:
         data = f.read()
         data = data.replace("{table}", html).replace("{interval}", config.interval).replace("{gaslimit}",
-                config.gaslimit).replace("{throughput}", config.throughput).replace("{executiontime}", convert())
+                config.gaslimit).replace("{throughput}", config.throughput).replace("{unit}", unit).replace(
+                "{executiontime}", convert())
         f.seek(0)
         f.write(data)
         f.truncate()
@@ -1,43 +1,118 @@
 #!/usr/bin/env python
+# Backs up the results of previous executions in a content-addressed store.
+# python backup-old-results.py --stage   moves the previous results to a staging folder (fast, run before benchmarking)
+# python backup-old-results.py           archives every staged folder (slow, can run in background)
+# python backup-old-results.py --restore <manifest> --target <folder>   restores the files of a backup manifest
 import os, shutil
-import zipfile
+import gzip
+import json
+import hashlib
+import argparse
 from datetime import datetime
 
+OLD_PATH = "analyzer/old/"
+STAGING_PATH = OLD_PATH + "staging/"
+OBJECTS_PATH = OLD_PATH + "objects/"
+MANIFESTS_PATH = OLD_PATH + "manifests/"
+BACKUP_FOLDERS = {
+    "reports": "workload/caliper-reports/",
+    "aggregated": "analyzer/aggregated-results/",
+}
 
-def zipdir(path, ziph):
-    for root, dirs, files in os.walk(path):
-        for file in files:
-            ziph.write(os.path.join(root, file))
 
+def load_args():
+    parser = argparse.ArgumentParser(description="This script backs up the results of previous executions")
+    parser.add_argument("--stage", help="Only move the previous results to the staging folder", action='store_true')
+    parser.add_argument("--restore", help="Manifest of the backup to restore")
+    parser.add_argument("--target", help="Folder where the backup is restored", default="restored/")
+    return parser.parse_args()
 
-def delete(folder):
-    for filename in os.listdir(folder):
-        file_path = os.path.join(folder, filename)
-        try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            print('Failed to delete %s. Reason: %s' % (file_path, e))
 
+def stage(dt_string):
+    # renaming is cheap, so the result folders are free again before the first benchmark starts
+    for name, folder in BACKUP_FOLDERS.items():
+        staging_folder = os.path.join(STAGING_PATH, dt_string, name)
+        os.makedirs(staging_folder)
+        for filename in os.listdir(folder):
+            try:
+                shutil.move(os.path.join(folder, filename), os.path.join(staging_folder, filename))
+            except Exception as e:
+                print('Failed to stage %s. Reason: %s' % (filename, e))
 
-def backup(filename, currentdir, newdir, dt_string):
-    try:
-        zip_string = filename + dt_string + ".zip"
-        zipf = zipfile.ZipFile(zip_string, 'w', zipfile.ZIP_DEFLATED)
-        zipdir(currentdir, zipf)
-        zipf.close()
-        os.rename(zip_string, newdir + zip_string)
-    except Exception as e:
-        print('Failed to zip %s. Reason: %s' % (zip_string, e))
 
+def hash_file(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def object_path(digest):
+    return os.path.join(OBJECTS_PATH, digest[:2], digest)
+
+
+def store(file_path, digest):
+    # only content never seen in earlier backups is compressed and written
+    path = object_path(digest)
+    if os.path.exists(path):
+        return False
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(file_path, 'rb') as src, gzip.open(path + '.tmp', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.rename(path + '.tmp', path)
+    return True
 
-if __name__ == '__main__':
-    dt_string = datetime.now().strftime("%d%m%Y%H%M%S")
 
-    backup("reports-backup-", "workload/caliper-reports/", "analyzer/old/old-reports/", dt_string)
-    delete("workload/caliper-reports/")
+def backup(staged_run):
+    run_folder = os.path.join(STAGING_PATH, staged_run)
+    manifest = {"created": staged_run, "files": {}}
+    new_objects = 0
+    for root, dirs, files in os.walk(run_folder):
+        for file in files:
+            file_path = os.path.join(root, file)
+            try:
+                digest = hash_file(file_path)
+                if store(file_path, digest):
+                    new_objects += 1
+                manifest["files"][os.path.relpath(file_path, run_folder)] = digest
+            except Exception as e:
+                print('Failed to back up %s. Reason: %s' % (file_path, e))
+                return
+    if manifest["files"]:
+        manifest_path = os.path.join(MANIFESTS_PATH, "backup-" + staged_run + ".json")
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'), sort_keys=True)
+        os.rename(manifest_path + '.tmp', manifest_path)
+        print('Backup %s stored: %s files, %s new objects' % (staged_run, len(manifest["files"]), new_objects))
+    shutil.rmtree(run_folder)
+
+
+def restore(manifest_path, target):
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for relative_path, digest in manifest["files"].items():
+        file_path = os.path.join(target, relative_path)
+        if not os.path.isdir(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+        with gzip.open(object_path(digest), 'rb') as src, open(file_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    print('Backup restored under ' + target)
+
+
+if __name__ == '__main__':
+    args = load_args()
+    if args.restore:
+        restore(args.restore, args.target)
+        exit(0)
+    if args.stage:
+        stage(datetime.now().strftime("%Y%m%d%H%M%S"))
+        exit(0)
 
-    backup("aggregated-backup-", "analyzer/aggregated-results/", "analyzer/old/old-aggregated-results/", dt_string)
-    delete("analyzer/aggregated-results/")
+    for directory in (OBJECTS_PATH, MANIFESTS_PATH, STAGING_PATH):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+    # staged folders left by an interrupted backup are archived too
+    for staged_run in sorted(os.listdir(STAGING_PATH)):
+        backup(staged_run)
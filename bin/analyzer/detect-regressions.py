@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# Compares the reference points measured by the regression mode against the backups of previous executions.
+# python detect-regressions.py --select   writes the reference points to measure in 'regression-points'
+# python detect-regressions.py            compares the measured reference points and their failed repetitions
+#                                         ('regression-failures') and writes 'regression-result'
+import io
+import re
+import os
+import json
+import glob
+import argparse
+import itertools
+import random
+import results_store
+import throughput_model
+import workload_mix
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../config/config.json')
+REGRESSION_REPORTS_PATH = "workload/caliper-reports/regression/"
+RESULTS_PATH = "analyzer/aggregated-results/regression.csv"
+REGRESSION_REPORT_NAME = re.compile(r'(\d+)seconds-(\d+)-\d+\.html$')
+# Above this number of permutations the p-value is estimated with random permutations
+MAX_EXACT_PERMUTATIONS = 20000
+STATUS_OK = 'ok'
+STATUS_REGRESSION = 'regression'
+# the change is beyond the tolerance but there are too few runs to test it at the configured significance
+STATUS_INSUFFICIENT = 'insufficient baseline'
+
+
+def load_args():
+    parser = argparse.ArgumentParser(description="This script detects regressions against previous executions")
+    parser.add_argument("--select", help="Select the reference points to measure", action='store_true')
+    return parser.parse_args()
+
+
+def load_config(path):
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def load_history(manifests, name, points):
+    # {(interval, gaslimit): [{'throughput': x, 'latency': y}, ...]}, only the reports of the given points are parsed
+    history = {}
+    for interval, gaslimit, relative_path, digest in results_store.report_entries(manifests, points):
+        try:
+            values = throughput_model.parse_report(io.StringIO(results_store.read_object(digest)), name)
+        except Exception as e:
+            print('Failed to read the backup of %s. Reason: %s' % (relative_path, e))
+            continue
+        if values is not None:
+            history.setdefault((interval, gaslimit), []).append(values)
+    return history
+
+
+def find_last_optimum(manifests):
+    for manifest in manifests:
+        if results_store.OPTIMUM_NAME in manifest['files']:
+            optimum = json.loads(results_store.read_object(manifest['files'][results_store.OPTIMUM_NAME]))
+            return optimum['interval'], optimum['gaslimit']
+    return None
+
+
+def count_history(manifests):
+    # number of stored reports of every configuration, counted from the file names without reading them
+    counts = {}
+    for interval, gaslimit, relative_path, digest in results_store.report_entries(manifests):
+        counts[(interval, gaslimit)] = counts.get((interval, gaslimit), 0) + 1
+    return counts
+
+
+def select_points(config, manifests, counts):
+    # regression executions do not store an optimum, so it is searched in all the backups and not only the last ones
+    optimum = find_last_optimum(manifests)
+    if optimum is None:
+        print('No optimum found in the backups of previous executions')
+        return []
+    interval, gaslimit = optimum
+    interval_step = config['tool_config']['intervalStep']
+    gas_step = config['tool_config']['gasStep']
+    neighbours = [(interval + interval_step, gaslimit), (interval - interval_step, gaslimit),
+                  (interval, gaslimit + gas_step), (interval, gaslimit - gas_step)]
+    # neighbours are only useful if there is something to compare with, the most measured ones first
+    neighbours = sorted([point for point in neighbours if point in counts], key=lambda p: -counts[p])
+    return ([optimum] + neighbours)[:config['regression_config']['maxPoints']]
+
+
+def load_measurements(name):
+    measurements = {}
+    for file in glob.glob(REGRESSION_REPORTS_PATH + '*.html'):
+        match = REGRESSION_REPORT_NAME.search(file)
+        if match is None:
+            continue
+        values = throughput_model.parse_report(file, name)
+        if values is not None:
+            measurements.setdefault((int(match.group(1)), int(match.group(2))), []).append(values)
+    return measurements
+
+
+def count_combinations(n, k):
+    combinations = 1
+    for i in range(k):
+        combinations = combinations * (n - i) // (i + 1)
+    return combinations
+
+
+def permutation_test(baseline, current):
+    # One-sided p-value of the current mean being lower than the baseline mean, and the smallest p-value reachable
+    # with these sample sizes
+    def statistic(sample_a, sample_b):
+        return sum(sample_a) / len(sample_a) - sum(sample_b) / len(sample_b)
+
+    observed = statistic(baseline, current)
+    values = baseline + current
+    n = len(baseline)
+    combinations = count_combinations(len(values), len(current))
+    if combinations <= MAX_EXACT_PERMUTATIONS:
+        splits = itertools.combinations(range(len(values)), n)
+    else:
+        splits = (random.sample(range(len(values)), n) for _ in range(MAX_EXACT_PERMUTATIONS))
+        combinations = MAX_EXACT_PERMUTATIONS
+    extreme = 0
+    for split in splits:
+        split = set(split)
+        sample_a = [values[i] for i in split]
+        sample_b = [values[i] for i in range(len(values)) if i not in split]
+        if statistic(sample_a, sample_b) >= observed - 1e-12:
+            extreme += 1
+    return extreme / float(combinations), 1.0 / combinations
+
+
+def fisher_test(baseline_failed, baseline_runs, failed, runs):
+    # One-sided p-value of the current failure rate being higher than the baseline one (Fisher's exact test), and
+    # the smallest p-value reachable with these numbers of runs
+    total = baseline_runs + runs
+    failures = baseline_failed + failed
+    tables = count_combinations(total, runs)
+    extreme = sum(count_combinations(failures, k) * count_combinations(total - failures, runs - k)
+                  for k in range(failed, min(failures, runs) + 1))
+    return extreme / float(tables), 1.0 / tables
+
+
+def get_status(significance, worse, p_value, min_p_value):
+    # a change within the tolerance is never a regression, a bigger one that the baseline is too small to test is
+    # reported instead of passing
+    if not worse:
+        return STATUS_OK
+    if min_p_value >= significance:
+        return STATUS_INSUFFICIENT
+    return STATUS_REGRESSION if p_value < significance else STATUS_OK
+
+
+def load_failures():
+    # {(interval, gaslimit): failed repetitions} saved by main.py
+    if not os.path.exists('regression-failures'):
+        return {}
+    with open('regression-failures') as f:
+        return {tuple(int(value) for value in key.split(':')): count for key, count in json.load(f).items()}
+
+
+def compare(config, points, history, measurements, failures, baseline_failures):
+    significance = config['regression_config']['significance']
+    tolerance = config['regression_config']['tolerance']
+    rows = []
+    for point in sorted(points):
+        runs = len(measurements.get(point, []))
+        failed = failures.get(point, 0)
+        baseline_runs = len(history.get(point, []))
+        baseline_failed = baseline_failures.count(point)
+        baseline_total = baseline_runs + baseline_failed
+        baseline_rate = baseline_failed / float(baseline_total) if baseline_total else 0
+        rate = failed / float(runs + failed) if runs + failed else 0
+        p_value, min_p_value = fisher_test(baseline_failed, baseline_total, failed, runs + failed)
+        rows.append([point[0], point[1], 'failures', baseline_total, baseline_rate, runs + failed, rate,
+                     rate - baseline_rate, p_value,
+                     get_status(significance, rate - baseline_rate > tolerance, p_value, min_p_value)])
+        if runs == 0:
+            continue
+        for column, lower_is_worse in (('throughput', True), ('latency', False)):
+            current = [values[column] for values in measurements[point]]
+            current_mean = sum(current) / len(current)
+            if point not in history:
+                print('No history for block interval %s seconds and %s gas limit' % point)
+                rows.append([point[0], point[1], column, 0, '', len(current), current_mean, '', '',
+                             STATUS_INSUFFICIENT])
+                continue
+            baseline = [values[column] for values in history[point]]
+            # latency regressions are increases, so the test is done on the negated values
+            sign = 1 if lower_is_worse else -1
+            p_value, min_p_value = permutation_test([sign * x for x in baseline], [sign * x for x in current])
+            baseline_mean = sum(baseline) / len(baseline)
+            change = (current_mean - baseline_mean) / baseline_mean if baseline_mean else 0
+            rows.append([point[0], point[1], column, len(baseline), baseline_mean, len(current), current_mean,
+                         change, p_value, get_status(significance, sign * change < -tolerance, p_value, min_p_value)])
+    return rows
+
+
+def main():
+    args = load_args()
+    config = load_config(CONFIG_PATH)
+    manifests = results_store.load_manifests()
+    # only the last executions are the baseline of the comparison
+    baseline_manifests = manifests[:config['regression_config']['history']]
+    if args.select:
+        points = select_points(config, manifests, count_history(baseline_manifests))
+        print('Reference points: ' + str(points))
+        with open('regression-points', 'w') as f:
+            json.dump(points, f)
+        exit(0)
+
+    with open('regression-points') as f:
+        points = [tuple(point) for point in json.load(f)]
+    # the reference points are compared on the round optimized by the tool
+    name = workload_mix.get_objective(config['workload_config'])[0]
+    rows = compare(config, points, load_history(baseline_manifests, name, points), load_measurements(name),
+                   load_failures(), results_store.stored_failures(baseline_manifests, points))
+    header = ['blockInterval', 'gasLimit', 'metric', 'baselineRuns', 'baselineMean', 'currentRuns', 'currentMean',
+              'change', 'pValue', 'status']
+    with open(RESULTS_PATH, 'w') as f:
+        f.write(','.join(header) + '\n')
+        for row in rows:
+            f.write(','.join(str(value) for value in row) + '\n')
+    for row in rows:
+        print('%s seconds, %s gas limit, %s: %s (%s runs) -> %.2f (%s runs), change %s, p-value %s: %s' % (
+            row[0], row[1], row[2], '-' if row[4] == '' else '%.2f' % row[4], row[3], row[6], row[5],
+            '-' if row[7] == '' else '%.1f%%' % (row[7] * 100), '-' if row[8] == '' else '%.3f' % row[8],
+            row[9].upper()))
+    with open('regression-result', 'w') as f:
+        json.dump({'compared': len(rows), 'regressions': len([row for row in rows if row[9] == STATUS_REGRESSION]),
+                   'insufficient': len([row for row in rows if row[9] == STATUS_INSUFFICIENT])}, f)
+    exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import glob
 import argparse
 import pandas as pd
+import workload_mix
 
 
 def load_args():
@@ -11,7 +12,7 @@ def load_args():
     return parser.parse_args()
 
 
-def parse_file(files):
+def parse_file(files, workload_config, measurement):
     try:
         my_tables = []
         for file in files:
@@ -19,7 +20,13 @@ def parse_file(files):
             temp = tables[0]
             temp['fileName'] = file.split('/')[-1]
             my_tables.append(temp)
-        return my_tables[0].loc[my_tables[0]['Name'].isin(['transfer'])]['Throughput (TPS)'].values.tolist()[0]
+        for name, tps in zip(my_tables[0]['Name'], my_tables[0]['Throughput (TPS)']):
+            print('Round %s: %s TPS, %s gas/s%s' % (
+                name, tps, workload_mix.gas_per_second(workload_config, name, tps, measurement),
+                '' if measurement is not None and name in measurement else ' (estimated)'))
+        name, metric = workload_mix.get_objective(workload_config)
+        tps = my_tables[0].loc[my_tables[0]['Name'].isin([name])]['Throughput (TPS)'].values.tolist()[0]
+        return workload_mix.objective_value(workload_config, name, tps, measurement)
     except Exception as e:
         print('Failed to obtain the TPS for the report. Reason: %s' % e)
     exit(-1)
@@ -30,7 +37,7 @@ def main():
     config = load_args()
     last_report = 'workload/caliper-reports/' + config.interval + 'seconds-' + config.gaslimit + '.html'
     files = glob.glob(last_report)
-    tps = parse_file(files)
+    tps = parse_file(files, workload_mix.load_workload_config(), workload_mix.load_measurement(last_report))
     with open('last-tps', "w") as file:
         file.write(str(tps))
     exit(0)
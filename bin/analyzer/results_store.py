@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Access to the results of previous executions stored by backup-old-results.py.
+import os
+import re
+import json
+import gzip
+import glob
+
+OLD_PATH = "analyzer/old/"
+MANIFESTS_PATH = OLD_PATH + "manifests/"
+OBJECTS_PATH = OLD_PATH + "objects/"
+REPORT_NAME = re.compile(r'^reports/(?:regression/)?(\d+)seconds-(\d+)(?:-\d+)?\.html$')
+PROGRESS_NAME = "aggregated/progress.json"
+OPTIMUM_NAME = "aggregated/optimum.json"
+# Benchmark statuses saved by main.py for failures caused by the SUT
+SUT_FAILURES = ("sut_saturation", "unknown")
+
+
+def load_manifests(limit=None):
+    # newest backups first
+    manifests = []
+    for path in sorted(glob.glob(MANIFESTS_PATH + 'backup-*.json'), reverse=True)[:limit]:
+        with open(path) as f:
+            manifests.append(json.load(f))
+    return manifests
+
+
+def read_object(digest):
+    with gzip.open(os.path.join(OBJECTS_PATH, digest[:2], digest), 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def report_entries(manifests, points=None):
+    # (interval, gaslimit, relative path, digest) of the stored caliper reports, only for the given points if any
+    entries = []
+    for manifest in manifests:
+        for relative_path, digest in manifest['files'].items():
+            match = REPORT_NAME.match(relative_path)
+            if match is None:
+                continue
+            point = (int(match.group(1)), int(match.group(2)))
+            if points is None or point in points:
+                entries.append(point + (relative_path, digest))
+    return entries
+
+
+def stored_measurement(manifest, relative_path):
+    # gas measured by run-caliper.py for a stored caliper report, None if it was not measured
+    digest = manifest['files'].get(re.sub(r'\.html$', '.json', relative_path))
+    if digest is None:
+        return None
+    return json.loads(read_object(digest))
+
+
+def progress_failures(progress, points=None):
+    # (interval, gaslimit) of every benchmark failed because of the SUT in a progress dashboard state
+    failures = []
+    for point in progress['points']:
+        key = (int(point['interval']), int(point['gaslimit']))
+        if point['status'] in SUT_FAILURES and (points is None or key in points):
+            failures.append(key)
+    return failures
+
+
+def stored_failures(manifests, points=None):
+    failures = []
+    for manifest in manifests:
+        if PROGRESS_NAME in manifest['files']:
+            failures += progress_failures(json.loads(read_object(manifest['files'][PROGRESS_NAME])), points)
+    return failures
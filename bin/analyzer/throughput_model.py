@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# Fits a throughput and latency surface over block interval x block gas limit from the caliper reports and
+# predicts the values of configurations that have not been benchmarked.
+# python throughput_model.py --interval <block interval> --gaslimit <block gas limit>
+import io
+import os
+import re
+import json
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+import results_store
+import workload_mix
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../config/config.json')
+REPORTS_PATH = "workload/caliper-reports/*.html"
+PROGRESS_PATH = "analyzer/aggregated-results/progress.json"
+REPORT_NAME = re.compile(r'(\d+(?:\.\d+)?)seconds-(\d+)\.html$')
+COLUMNS = {
+    'throughput': 'Throughput (TPS)',
+    'latency': 'Avg Latency (s)',
+}
+# Candidate kernel length scales (normalized inputs) and noise variances (normalized outputs)
+LENGTH_SCALES = (0.1, 0.2, 0.3, 0.5, 1.0)
+NOISE_VARIANCES = (0.01, 0.05, 0.1, 0.3)
+# Previous executions used by the model if "modelHistory" is not configured
+DEFAULT_MODEL_HISTORY = 20
+
+
+def load_args():
+    parser = argparse.ArgumentParser(description="This script predicts throughput and latency of a configuration")
+    parser.add_argument("--interval", help="Block interval", type=float, required=True)
+    parser.add_argument("--gaslimit", help="Block gas limit", type=float, required=True)
+    parser.add_argument("--name", help="Caliper round used for the prediction",
+                        default=workload_mix.get_objective(workload_mix.load_workload_config())[0])
+    parser.add_argument("--reports", help="Caliper reports of the current execution used to fit the model",
+                        default=REPORTS_PATH)
+    parser.add_argument("--nohistory", help="Ignore the results of previous executions", action='store_true')
+    return parser.parse_args()
+
+
+def load_model_history(path=CONFIG_PATH):
+    # number of previous executions used to fit the model
+    with open(path) as fp:
+        return json.load(fp)['tool_config'].get('modelHistory', DEFAULT_MODEL_HISTORY)
+
+
+def parse_report(report, name='transfer'):
+    # report can be a file path or a file-like object with the html of a caliper report
+    table = pd.read_html(report)[0]
+    row = table.loc[table['Name'] == name]
+    if row.empty:
+        return None
+    return {column: float(row[report_column].values[0]) for column, report_column in COLUMNS.items()}
+
+
+def load_points(reports=REPORTS_PATH, name='transfer', history=None):
+    # Benchmark results of the current execution and of the last history stored previous executions ("modelHistory"
+    # if not given, none if 0).
+    # Benchmarks failed because of the SUT have no report, they are added with no throughput and unknown latency.
+    # gasPerSecond is the gas measured by run-caliper.py, unknown for reports without measurement.
+    rows = []
+
+    def add_point(interval, gaslimit, report, source, load_measurement):
+        try:
+            values = parse_report(report, name)
+            if values is None:
+                return
+            point = {'blockInterval': float(interval), 'gasLimit': float(gaslimit)}
+            point.update(values)
+            measurement = load_measurement()
+            if measurement is not None and name in measurement:
+                point['gasPerSecond'] = measurement[name]['gasPerSecond']
+            rows.append(point)
+        except Exception as e:
+            print('Failed to read the report %s. Reason: %s' % (source, e))
+
+    def add_failures(failures):
+        for interval, gaslimit in failures:
+            rows.append({'blockInterval': float(interval), 'gasLimit': float(gaslimit), 'throughput': 0.0,
+                         'gasPerSecond': 0.0})
+
+    for file in glob.glob(reports):
+        match = REPORT_NAME.search(file)
+        if match is not None:
+            add_point(match.group(1), match.group(2), file, file, lambda: workload_mix.load_measurement(file))
+    if os.path.exists(PROGRESS_PATH):
+        with open(PROGRESS_PATH) as f:
+            add_failures(results_store.progress_failures(json.load(f)))
+    if history is None:
+        history = load_model_history()
+    if history > 0:
+        manifests = results_store.load_manifests(history)
+        for manifest in manifests:
+            for interval, gaslimit, relative_path, digest in results_store.report_entries([manifest]):
+                add_point(interval, gaslimit, io.StringIO(results_store.read_object(digest)), relative_path,
+                          lambda: results_store.stored_measurement(manifest, relative_path))
+        add_failures(results_store.stored_failures(manifests))
+    return pd.DataFrame(rows, columns=['blockInterval', 'gasLimit'] + list(COLUMNS) + ['gasPerSecond'])
+
+
+def _squared_distances(a, b):
+    return ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+
+
+def _kernel(a, b, length_scale):
+    return np.exp(-0.5 * _squared_distances(a, b) / length_scale ** 2)
+
+
+def _normalize(model, intervals, gaslimits):
+    x = np.column_stack([np.asarray(intervals, dtype=float), np.asarray(gaslimits, dtype=float)])
+    return (x - model['x_min']) / model['x_range']
+
+
+def fit_surface(points, column='throughput'):
+    # Gaussian process regression with a RBF kernel, hyperparameters chosen by maximum marginal likelihood.
+    # Repeated benchmarks of a configuration are averaged, so the cost depends on the explored configurations and not
+    # on the number of executions.
+    points = points.dropna(subset=[column]).groupby(['blockInterval', 'gasLimit'], as_index=False)[column].mean()
+    if len(points) == 0:
+        raise ValueError('No benchmark results to fit the ' + column + ' surface')
+    x = points[['blockInterval', 'gasLimit']].values.astype(float)
+    y = points[column].values.astype(float)
+    model = {
+        'x_min': x.min(axis=0),
+        'x_range': np.where(np.ptp(x, axis=0) > 0, np.ptp(x, axis=0), 1.0),
+        'y_mean': y.mean(),
+        'y_std': y.std() if y.std() > 0 else 1.0,
+    }
+    x = (x - model['x_min']) / model['x_range']
+    y = (y - model['y_mean']) / model['y_std']
+
+    best_likelihood = None
+    distances = _squared_distances(x, x)
+    for length_scale in LENGTH_SCALES:
+        kernel = np.exp(-0.5 * distances / length_scale ** 2)
+        for noise in NOISE_VARIANCES:
+            cholesky = np.linalg.cholesky(kernel + noise * np.eye(len(x)))
+            alpha = np.linalg.solve(cholesky.T, np.linalg.solve(cholesky, y))
+            likelihood = -0.5 * y.dot(alpha) - np.log(np.diag(cholesky)).sum()
+            if best_likelihood is None or likelihood > best_likelihood:
+                best_likelihood = likelihood
+                model.update({'x': x, 'alpha': alpha, 'cholesky': cholesky, 'length_scale': length_scale,
+                              'noise': noise})
+    return model
+
+
+def predict(model, intervals, gaslimits):
+    # Returns the mean and standard deviation of a new measurement for every configuration
+    x = _normalize(model, intervals, gaslimits)
+    cross_kernel = _kernel(x, model['x'], model['length_scale'])
+    mean = cross_kernel.dot(model['alpha'])
+    v = np.linalg.solve(model['cholesky'], cross_kernel.T)
+    variance = np.maximum(1.0 - (v ** 2).sum(axis=0), 0) + model['noise']
+    return mean * model['y_std'] + model['y_mean'], np.sqrt(variance) * model['y_std']
+
+
+def predict_grid(model, points, size=50):
+    # Evaluates the surface on a grid covering the explored configurations
+    intervals = np.linspace(points['blockInterval'].min(), points['blockInterval'].max(), size)
+    gaslimits = np.linspace(points['gasLimit'].min(), points['gasLimit'].max(), size)
+    grid_intervals, grid_gaslimits = np.meshgrid(intervals, gaslimits, indexing='ij')
+    mean, std = predict(model, grid_intervals.ravel(), grid_gaslimits.ravel())
+    return intervals, gaslimits, mean.reshape(grid_intervals.shape), std.reshape(grid_intervals.shape)
+
+
+def main():
+    config = load_args()
+    points = load_points(config.reports, config.name, 0 if config.nohistory else None)
+    print('Fitting the model with ' + str(len(points)) + ' benchmark results')
+    for column in COLUMNS:
+        mean, std = predict(fit_surface(points, column), [config.interval], [config.gaslimit])
+        print('Predicted %s for block interval %s seconds and %s gas limit: %.2f +/- %.2f (95%%: %.2f - %.2f)' % (
+            column, config.interval, int(config.gaslimit), mean[0], std[0], mean[0] - 1.96 * std[0],
+            mean[0] + 1.96 * std[0]))
+    exit(0)
+
+
+if __name__ == '__main__':
+    main()
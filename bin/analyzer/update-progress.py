@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Renders the progress dashboard from the state saved by main.py after every benchmark.
+import os
+import json
+import time
+
+ANALYZER_PATH = "analyzer/"
+html_template = ANALYZER_PATH + 'progress.html'
+html_result = ANALYZER_PATH + 'aggregated-results/progress.html'
+progress_state = ANALYZER_PATH + 'aggregated-results/progress.json'
+# Search phases benchmarking the block interval being explored
+INTERVAL_PHASES = ("Minimum gas limit", "Initial minimum gas limit", "Gas limit sweep", "Warm-started gas limit sweep")
+
+
+def convert(seconds):
+    # hours are not wrapped at a day, long searches take several days
+    seconds = int(seconds)
+    return "%02d hrs %02d mins %02d secs" % (seconds // 3600, seconds % 3600 // 60, seconds % 60)
+
+
+def estimate_remaining(progress):
+    # Rough estimate assuming the current peak holds, so the search ends after numberTrials more intervals
+    points = progress['points']
+    if not points:
+        return None
+    seconds_per_point = sum(point['seconds'] for point in points) / float(len(points))
+    if progress['planned'] is not None:
+        return max(progress['planned'] - len(points), 0) * seconds_per_point
+    interval_points = [point for point in points if point['phase'] in INTERVAL_PHASES]
+    if progress['peaks'] == 0:
+        return None
+    current_points = len([point for point in interval_points if point['interval'] == progress['interval']])
+    points_per_interval = (len(interval_points) - current_points) / float(progress['peaks'])
+    remaining_intervals = max(progress['trials'] + 1 - progress['peaks'], 1)
+    remaining_points = max(remaining_intervals * points_per_interval - current_points, 1)
+    return remaining_points * seconds_per_point
+
+
+def render_phases(progress):
+    rows = ''
+    for phase, timing in progress['phases'].items():
+        rows += '<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>\n' % (
+            phase, timing['benchmarks'], convert(timing['seconds']),
+            convert(timing['seconds'] / timing['benchmarks']))
+    return rows
+
+
+def render_points(progress):
+    rows = ''
+    # newest first, so the last measured point is always visible
+    for point in reversed(progress['points']):
+        rows += '<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>\n' % (
+            point['phase'], point['interval'], point['gaslimit'], point['status'],
+            '' if point['throughput'] is None else point['throughput'], convert(point['seconds']))
+    return rows
+
+
+def main():
+    with open(progress_state) as f:
+        progress = json.load(f)
+    best = progress['best']
+    if best is None:
+        best_text = 'No throughput measured yet.'
+    else:
+        best_text = 'Current best throughput of <strong>%s %s</strong> with a block interval of <strong>%s seconds' \
+                    '</strong> and <strong>%s</strong> block gas limit.' % (best['throughput'], progress['unit'],
+                                                                          best['interval'], best['gaslimit'])
+    remaining = estimate_remaining(progress)
+    with open(html_template) as f:
+        data = f.read()
+    data = data.replace("{best}", best_text).replace("{elapsed}", convert(time.time() - progress['start'])).replace(
+        "{eta}", 'unknown' if remaining is None else convert(remaining)).replace(
+        "{benchmarks}", str(len(progress['points']))).replace("{phases}", render_phases(progress)).replace(
+        "{points}", render_points(progress)).replace("{unit}", progress['unit']).replace(
+        "{updated}", time.strftime("%d/%m/%Y %H:%M:%S"))
+    # replaced at once, so a browser refreshing the dashboard never reads a partial file
+    with open(html_result + '.tmp', "w") as f:
+        f.write(data)
+    os.rename(html_result + '.tmp', html_result)
+    exit(0)
+
+
+if __name__ == '__main__':
+    main()
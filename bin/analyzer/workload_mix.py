@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# Gas costs and transaction types of the caliper rounds, used to report throughput in tx/s and gas/s.
+# The gas is measured by run-caliper.py, the configured gas per transaction is only used for reports without it.
+import os
+import re
+import json
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../config/config.json')
+MIX_PREFIX = 'mix-'
+METRIC_TPS = 'tps'
+METRIC_GAS = 'gas'
+METRIC_UNITS = {
+    METRIC_TPS: 'TPS',
+    METRIC_GAS: 'gas/s',
+}
+
+
+def load_workload_config(path=CONFIG_PATH):
+    with open(path) as fp:
+        return json.load(fp)['workload_config']
+
+
+def get_objective(workload_config):
+    # round and metric optimized by the tool, the transfer throughput if not configured
+    objective = workload_config.get('objective', {})
+    return objective.get('round', 'transfer'), objective.get('metric', METRIC_TPS)
+
+
+def load_measurement(report):
+    # gas measured by run-caliper.py for a caliper report, None if it was not measured
+    path = re.sub(r'\.html$', '.json', report)
+    if not os.path.exists(path):
+        return None
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def round_weights(workload_config, name):
+    # normalized weight of every transaction type in a round
+    if name.startswith(MIX_PREFIX):
+        weights = workload_config['mixes'][name[len(MIX_PREFIX):]]
+    elif name in workload_config.get('operations', {}):
+        weights = {name: 1}
+    else:
+        return {}
+    total = float(sum(weights.values()))
+    return {operation: weight / total for operation, weight in weights.items()}
+
+
+def gas_per_transaction(workload_config, name):
+    operations = workload_config.get('operations', {})
+    return sum(weight * operations.get(operation, 0)
+               for operation, weight in round_weights(workload_config, name).items())
+
+
+def gas_per_second(workload_config, name, tps, measurement=None):
+    if measurement is not None and name in measurement:
+        return measurement[name]['gasPerSecond']
+    return tps * gas_per_transaction(workload_config, name)
+
+
+def type_throughput(workload_config, name, tps, measurement=None):
+    # (tx/s, gas/s) of every transaction type sent by a round
+    if measurement is not None and name in measurement:
+        return {operation: (values['throughput'], values['gasPerSecond'])
+                for operation, values in measurement[name]['operations'].items()}
+    # not measured, the expected one as operations are picked randomly according to their weights
+    return {operation: (tps * weight, tps * weight * workload_config.get('operations', {}).get(operation, 0))
+            for operation, weight in round_weights(workload_config, name).items()}
+
+
+def objective_value(workload_config, name, tps, measurement=None):
+    if get_objective(workload_config)[1] == METRIC_GAS:
+        return gas_per_second(workload_config, name, tps, measurement)
+    return tps
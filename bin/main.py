@@ -27,7 +27,50 @@ RUN_WORKLOAD_PATH = WORKLOAD_PATH + "run-caliper.py"
 AGGREGATE_RESULTS_PATH = ANALYZER_PATH + "aggregate-html-reports.py"
 GET_LAST_RESULT_PATH = ANALYZER_PATH + "get-last-throughput.py"
 BACKUP_PATH = ANALYZER_PATH + "backup-old-results.py"
+REGRESSION_PATH = ANALYZER_PATH + "detect-regressions.py"
+PROGRESS_PATH = ANALYZER_PATH + "update-progress.py"
+PROGRESS_STATE_PATH = ANALYZER_PATH + "aggregated-results/progress.json"
+
+# Search phases shown in the progress dashboard
+PHASE_MIN_INTERVAL = "Minimum block interval"
+PHASE_INITIAL_MIN_GAS = "Initial minimum gas limit"
+PHASE_CURRENT_MIN_GAS = "Minimum gas limit"
+PHASE_GAS_SWEEP = "Gas limit sweep"
+PHASE_WARM_START = "Warm-started gas limit sweep"
+PHASE_REGRESSION = "Regression checks"
 MONITOR_PATH= ANALYZER_PATH + "monitor.sh"
+# Unit of the optimized metric ("objective" of the workload config), the same ones used by workload_mix.py
+METRIC_UNITS = {
+    "tps": "TPS",
+    "gas": "gas/s",
+}
+
+# Failure classes. Infrastructure-like failures are retried according to the
+# "failure_policy" config and never counted as a benchmark result, while SUT
+# failures are recorded as a crash of the benchmarked configuration.
+FAILURE_INFRASTRUCTURE = "infrastructure"
+FAILURE_NODE_NOT_SYNCED = "node_not_synced"
+FAILURE_CALIPER_CLIENT = "caliper_client"
+FAILURE_SUT_SATURATION = "sut_saturation"
+FAILURE_UNKNOWN = "unknown"
+SUT_FAILURES = (FAILURE_SUT_SATURATION, FAILURE_UNKNOWN)
+# Failures retried by deploying the SUT again
+REDEPLOY_FAILURES = (FAILURE_INFRASTRUCTURE, FAILURE_NODE_NOT_SYNCED)
+
+# Exit codes used by run-caliper.py to report an already classified failure
+FAILURE_EXIT_CODES = {
+    10: FAILURE_INFRASTRUCTURE,
+    11: FAILURE_NODE_NOT_SYNCED,
+    12: FAILURE_CALIPER_CLIENT,
+    13: FAILURE_SUT_SATURATION,
+}
+
+# Output patterns used to classify failures of scripts which do not classify them on their own (deploy-sut.sh)
+FAILURE_PATTERNS = (
+    (FAILURE_INFRASTRUCTURE, ('ERROR: (gcloud', 'QUOTA_EXCEEDED', 'Quota', 'rateLimitExceeded', 'ssh: connect to host',
+                              'Connection timed out', 'Connection closed by', 'Connection refused',
+                              'Permission denied (publickey)', 'Could not resolve host')),
+)
 
 
 def _get_path(filename):
@@ -42,6 +85,8 @@ def load_args():
     parser.add_argument("--verbose", help="The verbose level can be 0, 1 or 2", type=int, default=0)
     parser.add_argument("--monitor", help="Enables Ethstats monitoring over the SUT", action='store_true')
     parser.add_argument("--notbuildsut",  help="Disables the sut infrastructure building", action='store_true')
+    parser.add_argument("--regression", help="Measures the last optimum and its neighbours again and compares them "
+                                             "with previous executions", action='store_true')
 
     return parser.parse_args()
 
@@ -59,6 +104,40 @@ def load_config(path):
 
 
 config = load_config(CONFIG_PATH)
+metric_unit = METRIC_UNITS[config['workload_config'].get('objective', {}).get('metric', 'tps')]
+
+# State of the execution shown in the progress dashboard, updated after every benchmark
+progress = {
+    'start': time.time(),
+    'trials': config['tool_config']['numberTrials'],
+    'phases': {},
+    'points': [],
+    'best': None,
+    'peaks': 0,
+    'interval': None,
+    'planned': None,
+    'unit': metric_unit,
+}
+
+
+class ExecutionFailure(Exception):
+    def __init__(self, message, failure_type=FAILURE_UNKNOWN):
+        super(ExecutionFailure, self).__init__(message + ' (' + failure_type + ')')
+        self.failure_type = failure_type
+
+
+def classify_failure(return_code, output_lines):
+    if return_code in FAILURE_EXIT_CODES:
+        return FAILURE_EXIT_CODES[return_code]
+    for failure_type, patterns in FAILURE_PATTERNS:
+        for line in output_lines:
+            if any(pattern in line for pattern in patterns):
+                return failure_type
+    return FAILURE_UNKNOWN
+
+
+def is_sut_failure(e):
+    return not isinstance(e, ExecutionFailure) or e.failure_type in SUT_FAILURES
 
 
 def run_file(file_path, verbose=True):
@@ -68,10 +147,12 @@ def run_file(file_path, verbose=True):
         stderr=subprocess.PIPE,
         universal_newlines=True
     )
+    output_lines = []
 
     while True:
         output = process.stdout.readline()
         err_output = process.stderr.readline()
+        output_lines.extend([output, err_output])
         if verbose:
             print(output.strip())
             print(err_output.strip())
@@ -79,22 +160,91 @@ def run_file(file_path, verbose=True):
         return_code = process.poll()
         if return_code is not None:
             for output in process.stdout.readlines():
+                output_lines.append(output)
                 if verbose:
                     print(output.strip())
             for output in process.stderr.readlines():
+                output_lines.append(output)
                 if verbose:
                     print(output.strip())
 
             if return_code:
-                raise Exception(
+                raise ExecutionFailure(
                     'File "{}" has not finished successfully'.format(
                         file_path[1],
-                    )
+                    ),
+                    classify_failure(return_code, output_lines)
                 )
 
             break
 
 
+def update_progress():
+    # Only the state of the execution is saved, the dashboard is rendered from it without aggregating the reports
+    try:
+        with open(_get_path(PROGRESS_STATE_PATH) + '.tmp', "w") as file:
+            json.dump(progress, file)
+        os.rename(_get_path(PROGRESS_STATE_PATH) + '.tmp', _get_path(PROGRESS_STATE_PATH))
+        run_file(['python', _get_path(PROGRESS_PATH)], verbose=verbose_level >= VERBOSE_LEVEL_2)
+    except Exception as e:
+        if verbose_level >= VERBOSE_LEVEL_1:
+            print('Failed to update the progress dashboard. Reason: %s' % e)
+
+
+def record_benchmark(phase, interval, gaslimit, start, status):
+    timing = progress['phases'].setdefault(phase, {'benchmarks': 0, 'seconds': 0})
+    timing['benchmarks'] += 1
+    timing['seconds'] += time.time() - start
+    progress['points'].append({'phase': phase, 'interval': interval, 'gaslimit': gaslimit, 'status': status,
+                               'seconds': int(time.time() - start), 'throughput': None})
+    update_progress()
+
+
+def record_throughput(interval, gaslimit, tps):
+    progress['points'][-1]['throughput'] = tps
+    if progress['best'] is None or tps > progress['best']['throughput']:
+        progress['best'] = {'interval': interval, 'gaslimit': gaslimit, 'throughput': tps}
+    update_progress()
+
+
+def run_benchmark(interval, gaslimit, phase):
+    # Deploys the SUT and executes the workload. Infrastructure failures and nodes not synced, reported at once by
+    # run-caliper.py, are retried with exponential backoff deploying the SUT again, any other failure is raised to
+    # the caller.
+    retries = {}
+    start = time.time()
+    while True:
+        try:
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print('Deploying SUT')
+            run_file(
+                ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']), str(interval),
+                 str(gaslimit), "0", '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
+                verbose=verbose_level >= VERBOSE_LEVEL_2)
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print('SUT successfully deployed')
+                print('Executing the workload')
+            run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval), '--gaslimit',
+                      str(gaslimit)],
+                     verbose=verbose_level >= VERBOSE_LEVEL_2)
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print('Workload executed')
+            record_benchmark(phase, interval, gaslimit, start, 'ok')
+            return
+        except ExecutionFailure as e:
+            retry = retries.get(e.failure_type, 0)
+            if e.failure_type not in REDEPLOY_FAILURES or retry >= config['failure_policy'][e.failure_type]['retries']:
+                record_benchmark(phase, interval, gaslimit, start, e.failure_type)
+                raise
+            policy = config['failure_policy'][e.failure_type]
+            backoff = policy['backoff'] * (2 ** retry)
+            retries[e.failure_type] = retry + 1
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print('Failure: %s. Deploying again in %s seconds (%s/%s)' % (
+                    e, str(backoff), str(retry + 1), str(policy['retries'])))
+            time.sleep(backoff)
+
+
 def get_last_tps(interval, gaslimit):
     run_file(['python', _get_path(GET_LAST_RESULT_PATH), '--interval', str(interval), '--gaslimit',
               str(gaslimit)],
@@ -103,8 +253,8 @@ def get_last_tps(interval, gaslimit):
     with open('last-tps', "r") as file:
         tps = float(file.read())
     if verbose_level >= VERBOSE_LEVEL_1:
-        print("Last execution tps for block interval " + str(interval) + " seconds and " + str(
-            gaslimit) + " gas limit: " + str(tps))
+        print("Last execution throughput for block interval " + str(interval) + " seconds and " + str(
+            gaslimit) + " gas limit: " + str(tps) + " " + metric_unit)
     return tps
 
 
@@ -118,20 +268,7 @@ def find_min_interval():
                 print('Benchmarking to find minimum block interval value, current configuration ' + str(
                     interval) + ' seconds and ' +
                       str(config['tool_config']['defaultGas']) + ' gas limit.')
-                print('Deploying SUT')
-            run_file(
-                ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']), str(interval),
-                 str(config['tool_config']['defaultGas']), "0",
-                 '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
-                verbose=verbose_level >= VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('SUT successfully deployed')
-                print('Executing the workload')
-            run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval), '--gaslimit',
-                      str(config['tool_config']['defaultGas'])],
-                     verbose=verbose_level == VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('Workload executed')
+            run_benchmark(interval, config['tool_config']['defaultGas'], PHASE_MIN_INTERVAL)
             # UNCOMMENT ONLY FOR TESTING PURPOSES
             # run_file(
             #    ['sh', _get_path('test.sh'), str(interval),
@@ -140,6 +277,8 @@ def find_min_interval():
                 print('Minimum block interval found! ' + str(interval) + ' seconds.')
             return interval
         except Exception as e:
+            if not is_sut_failure(e):
+                raise
             if verbose_level >= VERBOSE_LEVEL_1:
                 print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
                     str(interval), str(config['tool_config']['defaultGas']), e))
@@ -163,23 +302,12 @@ def find_initial_min_gas_limit(interval):
                 print(
                     "Benchmarking with block interval of " + str(interval) + " seconds and " + str(
                         upper_bound) + " gas limit.")
-                print('Deploying SUT')
-            run_file(
-                ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']),
-                 str(interval),
-                 str(upper_bound), "0", '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
-                verbose=verbose_level == VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('SUT successfully deployed')
-                print('Executing the workload')
-            run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval),
-                      '--gaslimit',
-                      str(upper_bound)], verbose=verbose_level == VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('Workload executed')
+            run_benchmark(interval, upper_bound, PHASE_INITIAL_MIN_GAS)
             # yes
             break
         except Exception as e:
+            if not is_sut_failure(e):
+                raise
             if verbose_level >= VERBOSE_LEVEL_1:
                 print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
                     str(interval), str(upper_bound), e))
@@ -198,19 +326,7 @@ def find_initial_min_gas_limit(interval):
             if verbose_level >= VERBOSE_LEVEL_1:
                 print("Benchmarking with " + str(upper_bound) + " upper bound and " + str(
                     lower_bound) + " lower bound to find the minimum gas limit")
-                print('Deploying SUT')
-            run_file(
-                ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']),
-                 str(interval),
-                 str(upper_bound), "0", '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
-                verbose=verbose_level >= VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('SUT successfully deployed')
-                print('Executing the workload')
-            run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval),
-                      '--gaslimit', str(upper_bound)], verbose=verbose_level >= VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('Workload executed')
+            run_benchmark(interval, upper_bound, PHASE_INITIAL_MIN_GAS)
             # UNCOMMENT ONLY FOR TESTING PURPOSES
             # run_file(
             #    ['sh', _get_path('test.sh'),
@@ -228,6 +344,8 @@ def find_initial_min_gas_limit(interval):
                 working_upper_bound = upper_bound
                 upper_bound = int((upper_bound + lower_bound) / 2)
         except Exception as e:
+            if not is_sut_failure(e):
+                raise
             if verbose_level >= VERBOSE_LEVEL_1:
                 print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
                     str(interval), str(upper_bound), e))
@@ -246,20 +364,7 @@ def find_current_min_gas_limit(interval, pre_min_gaslimit):
         try:
             if verbose_level >= VERBOSE_LEVEL_1:
                 print("Calculating minimum gas limit for block interval " + str(interval) + "s")
-                print("Deploying SUT")
-            run_file(
-                ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']),
-                 str(interval),
-                 str(pre_min_gaslimit), '0', '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
-                verbose=verbose_level >= VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('SUT successfully deployed')
-                print('Executing the workload')
-            run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval),
-                      '--gaslimit',
-                      str(pre_min_gaslimit)], verbose=verbose_level >= VERBOSE_LEVEL_2)
-            if verbose_level >= VERBOSE_LEVEL_1:
-                print('Workload executed')
+            run_benchmark(interval, pre_min_gaslimit, PHASE_CURRENT_MIN_GAS)
             success = True
             if verbose_level >= VERBOSE_LEVEL_1:
                 print(
@@ -269,12 +374,80 @@ def find_current_min_gas_limit(interval, pre_min_gaslimit):
             #    ['sh', _get_path('test.sh'),
             #     str(config['tool_config']['defaultInterval']), str(gas)])
         except Exception as e:
+            if not is_sut_failure(e):
+                raise
             print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
                 str(interval), str(pre_min_gaslimit), e))
             pre_min_gaslimit += accuracy
     return pre_min_gaslimit
 
 
+def predict_gas_limit(peaks, interval):
+    # Extrapolates the gas per second of the peaks found at the last intervals to the new block interval
+    rates = []
+    for peak in peaks[-config["tool_config"]["numberTrials"]:]:
+        peak_interval, peak_gas_limit = next(iter(peak)).split(":")
+        # intervals without any successful benchmark have no peak gas limit
+        if int(peak_gas_limit) > 0:
+            rates.append(float(peak_gas_limit) / float(peak_interval))
+    if len(rates) == 0:
+        return None
+    accuracy = config["tool_config"]["gasLimitAccuracy"]
+    gas_limit = int(round(sum(rates) / len(rates) * interval / accuracy)) * accuracy
+    # kept within the gas limits the tool is configured to explore
+    return min(max(gas_limit, config["tool_config"]["minGas"]), config["tool_config"]["maxGas"])
+
+
+def warm_start_sweep(interval, predicted_gas_limit, results):
+    # Benchmarks the predicted gas limit and searches outward from it: upwards first and, only if going up brings no
+    # improvement, downwards. Each direction stops after numberTrials benchmarks without improvement or at the
+    # minGas / maxGas bounds.
+    trials = config["tool_config"]["numberTrials"]
+    sensitivity = config["tool_config"]["sensitivity"]
+    gas_step = config["tool_config"]["gasStep"]
+    min_gas = config["tool_config"]["minGas"]
+    max_gas = config["tool_config"]["maxGas"]
+
+    def measure(gas):
+        if verbose_level >= VERBOSE_LEVEL_1:
+            print("Benchmarking with block interval of " + str(interval) + " seconds and " + str(gas) + " gas limit.")
+        try:
+            run_benchmark(interval, gas, PHASE_WARM_START)
+            results[interval][gas] = get_last_tps(interval, gas)
+            record_throughput(interval, gas, results[interval][gas])
+        except Exception as e:
+            if not is_sut_failure(e):
+                raise
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
+                    str(interval), str(gas), e))
+            results[interval][gas] = -1
+        return results[interval][gas]
+
+    best_gas = predicted_gas_limit
+    best_tps = measure(best_gas)
+    for direction in (1, -1):
+        if direction < 0 and best_gas != predicted_gas_limit:
+            break
+        gas = best_gas
+        misses = 0
+        while misses < trials:
+            gas += direction * gas_step
+            if gas < min_gas or gas > max_gas:
+                break
+            tps = measure(gas)
+            if tps > 0 and (best_tps <= 0 or 1 - (best_tps / tps) > sensitivity):
+                if verbose_level >= VERBOSE_LEVEL_1:
+                    print("Improvement found, continue with gas limit " + str(gas))
+                best_gas = gas
+                best_tps = tps
+                misses = 0
+            else:
+                misses += 1
+    if verbose_level >= VERBOSE_LEVEL_1:
+        print("Improvement difference is less than the sensitivity given, last feasible gas limit found")
+
+
 def find_optimal_parameters():
     results = {}
     peaks = []
@@ -297,8 +470,17 @@ def find_optimal_parameters():
         if verbose_level >= VERBOSE_LEVEL_1:
             print("Performing benchmarks with block interval of " + str(interval) + " seconds.")
         results[interval] = {}
+        progress['interval'] = interval
         stop_reached = False
-        if len(peaks) == 0:
+        predicted_gas_limit = None
+        if len(peaks) > 0 and config["tool_config"]["warmStart"]:
+            predicted_gas_limit = predict_gas_limit(peaks, interval)
+        if predicted_gas_limit is not None:
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print("Predicted gas limit from previous peaks: " + str(predicted_gas_limit))
+            warm_start_sweep(interval, predicted_gas_limit, results)
+            stop_reached = True
+        elif len(peaks) == 0:
             minimum_gas_limit = find_initial_min_gas_limit(interval)
             if minimum_gas_limit < 0:
                 # failed to get minimum block gas limit for x interval. Stopping tool execution
@@ -307,8 +489,9 @@ def find_optimal_parameters():
         else:
             minimum_gas_limit = find_current_min_gas_limit(interval, minimum_gas_limit)
 
-        print("Minimum gas limit found: " + str(minimum_gas_limit))
-        gas = minimum_gas_limit
+        if not stop_reached:
+            print("Minimum gas limit found: " + str(minimum_gas_limit))
+            gas = minimum_gas_limit
         tries = 0
         gaslimit_queue = queue.Queue()
         while not stop_reached:
@@ -317,20 +500,7 @@ def find_optimal_parameters():
                     "Benchmarking with block interval of " + str(interval) + " seconds and " + str(gas) + " gas limit.")
             # benchmarking with block interval x and block gas limit y
             try:
-                if verbose_level >= VERBOSE_LEVEL_1:
-                    print('Deploying SUT')
-                run_file(
-                    ['bash', _get_path(DEPLOY_SUT_PATH), str(config['sut_config']['nodeNumber']),
-                     str(interval),
-                     str(gas), "0", '--no-user-output-enabled' if verbose_level == VERBOSE_LEVEL_0 else ''],
-                    verbose=verbose_level >= VERBOSE_LEVEL_2)
-                if verbose_level >= VERBOSE_LEVEL_1:
-                    print('SUT successfully deployed')
-                    print('Executing the workload')
-                run_file(['python', _get_path(RUN_WORKLOAD_PATH), '--interval', str(interval),
-                          '--gaslimit', str(gas)], verbose=verbose_level >= VERBOSE_LEVEL_2)
-                if verbose_level >= VERBOSE_LEVEL_1:
-                    print('Workload executed')
+                run_benchmark(interval, gas, PHASE_GAS_SWEEP)
                 # UNCOMMENT ONLY FOR TESTING PURPOSES
                 # run_file(
                 #    ['sh', _get_path('test.sh'),
@@ -338,6 +508,7 @@ def find_optimal_parameters():
                 if verbose_level >= VERBOSE_LEVEL_1:
                     print('Obtaining peak and checking to continue or not')
                 last_tps = get_last_tps(interval, gas)
+                record_throughput(interval, gas, last_tps)
                 results[interval][gas] = last_tps
                 # Is optimal gas limit for x interval found?
                 if gaslimit_queue.qsize() >= trials:
@@ -372,6 +543,8 @@ def find_optimal_parameters():
                     gaslimit_queue.put(last_tps)
                     gas += gas_step
             except Exception as e:
+                if not is_sut_failure(e):
+                    raise
                 if verbose_level >= VERBOSE_LEVEL_1:
                     print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
                         str(interval), str(gas), e))
@@ -401,9 +574,10 @@ def find_optimal_parameters():
         if verbose_level >= VERBOSE_LEVEL_1:
             print(
                 "Peak in block interval " + str(interval) + " seconds found. Found in "
-                + str(max_key) + " gas limit with " + str(last_peak) + " TPS.")
+                + str(max_key) + " gas limit with " + str(last_peak) + " " + metric_unit + ".")
         # saving the last peak in the array of peaks
         peaks.append({str(interval) + ":" + str(max_key): max_value})
+        progress['peaks'] = len(peaks)
         # can we improve more the tps?
         if len(peaks) > trials:
             if verbose_level >= VERBOSE_LEVEL_1:
@@ -445,6 +619,45 @@ def find_optimal_parameters():
     return best_parameters
 
 
+def check_regressions():
+    run_file(['python', _get_path(REGRESSION_PATH), '--select'], verbose=verbose_level >= VERBOSE_LEVEL_1)
+    with open('regression-points', "r") as file:
+        points = json.load(file)
+    if len(points) == 0:
+        print("No reference points to check for regressions.")
+        return -1
+    repetitions = config['regression_config']['repetitions']
+    progress['planned'] = len(points) * repetitions
+    os.makedirs('workload/caliper-reports/regression', exist_ok=True)
+    # failed repetitions count against the reference points, they are compared with the failures of the baseline
+    failures = {}
+    for interval, gaslimit in points:
+        report = 'workload/caliper-reports/' + str(interval) + 'seconds-' + str(gaslimit)
+        for repetition in range(repetitions):
+            if verbose_level >= VERBOSE_LEVEL_1:
+                print("Measuring reference point with block interval of " + str(interval) + " seconds and " + str(
+                    gaslimit) + " gas limit (" + str(repetition + 1) + "/" + str(repetitions) + ")")
+            try:
+                run_benchmark(interval, gaslimit, PHASE_REGRESSION)
+                # the caliper report and the gas measured for it, if any
+                for extension in ('.html', '.json'):
+                    if os.path.exists(report + extension):
+                        os.rename(report + extension, 'workload/caliper-reports/regression/' + str(
+                            interval) + 'seconds-' + str(gaslimit) + '-' + str(repetition) + extension)
+            except Exception as e:
+                if not is_sut_failure(e):
+                    raise
+                print('Failed execution with configuration %s seconds and %s gas limit. Reason: %s' % (
+                    str(interval), str(gaslimit), e))
+                key = str(interval) + ':' + str(gaslimit)
+                failures[key] = failures.get(key, 0) + 1
+    with open('regression-failures', "w") as file:
+        json.dump(failures, file)
+    run_file(['python', _get_path(REGRESSION_PATH)], verbose=True)
+    with open('regression-result', "r") as file:
+        return json.load(file)
+
+
 if __name__ == '__main__':
     print('Starting tool execution')
     start_time = time.time()
@@ -452,13 +665,19 @@ if __name__ == '__main__':
     verbose_level = args.verbose
     sut_build = args.notbuildsut
     monitor = args.monitor
+    regression = args.regression
     if verbose_level not in ALLOWED_VERBOSE_LEVELS:
         print('You can use only next verbose levels: {}'.format(
             ', '.join(map(str, ALLOWED_VERBOSE_LEVELS)))
         )
         exit(1)
-    # Backing up old results
-    run_file(['python', _get_path(BACKUP_PATH)], verbose=verbose_level == VERBOSE_LEVEL_2)
+    # Backing up old results: staging is fast, archiving runs in background while benchmarking
+    run_file(['python', _get_path(BACKUP_PATH), '--stage'], verbose=verbose_level == VERBOSE_LEVEL_2)
+    backup_process = subprocess.Popen(['python', _get_path(BACKUP_PATH)],
+                                      stdout=None if verbose_level == VERBOSE_LEVEL_2 else subprocess.DEVNULL)
+    if regression:
+        # the regression checks compare against the backups, so they must be complete
+        backup_process.wait()
     #FLAG TO MONITOR SUT COMMENTED
     #if monitor:
     #   execute monitor.sh
@@ -479,8 +698,26 @@ if __name__ == '__main__':
         exit(-1)
     print('SUT infrastructure successfully built')
 
+    if regression:
+        print('Checking for performance regressions against previous executions')
+        try:
+            result = check_regressions()
+        except ExecutionFailure as e:
+            print("Error executing Optibench tool. Regression checks stopped after a non-SUT failure: " + str(e))
+            exit(-1)
+        if result == -1:
+            exit(-1)
+        print("Regressions found: " + str(result['regressions']) + ". Changes that could not be tested: " + str(
+            result['insufficient']) + ". Results under /bin/analyzer/aggregated-results/regression.csv.")
+        # changes too big to ignore but that can not be tested with the current baseline must not pass the gate
+        exit(1 if result['regressions'] else 2 if result['insufficient'] else 0)
+
     print('Starting calculation of optimal block interval and block gas limit for maximum throughput')
-    result = find_optimal_parameters()
+    try:
+        result = find_optimal_parameters()
+    except ExecutionFailure as e:
+        print("Error executing Optibench tool. Benchmarking stopped after a non-SUT failure: " + str(e))
+        exit(-1)
     print("Best result found: " + str(result))
     if verbose_level >= VERBOSE_LEVEL_1:
         print('Aggregating all the workload reports')
@@ -488,6 +725,10 @@ if __name__ == '__main__':
     throughput = result[key]
     interval = key.split(":")[0]
     gaslimit = key.split(":")[1]
+    # the fitted surfaces use the results of previous executions, so their backup must be complete
+    if backup_process.poll() is None:
+        print("Waiting for the backup of old results to finish")
+        backup_process.wait()
     exec_time = int(time.time() - start_time)
     run_file(['python', _get_path(AGGREGATE_RESULTS_PATH), "--interval", interval,
               "--gaslimit", gaslimit, "--throughput", str(throughput), "--executiontime", str(exec_time)],
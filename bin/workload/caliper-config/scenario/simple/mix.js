@@ -0,0 +1,130 @@
+/*
+* Licensed under the Apache License, Version 2.0 (the "License");
+* you may not use this file except in compliance with the License.
+* You may obtain a copy of the License at
+*
+* http://www.apache.org/licenses/LICENSE-2.0
+*
+* Unless required by applicable law or agreed to in writing, software
+* distributed under the License is distributed on an "AS IS" BASIS,
+* WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+* See the License for the specific language governing permissions and
+* limitations under the License.
+*/
+
+'use strict';
+
+module.exports.info = 'weighted mix of transactions';
+
+// Operations of the simple contract, from the most to the least gas consuming:
+// open (new account, new storage slot), transfer (two storage updates),
+// update (open of an existing account, one storage update) and query (read only)
+const OPERATIONS = ['open', 'transfer', 'update', 'query'];
+const stats = require('./stats.js');
+
+let bc, contx;
+let account_array;
+let initmoney;
+let weights;
+let totalWeight;
+let opened = 0;
+
+module.exports.init = function (blockchain, context, args) {
+    const open = require('./open.js');
+    if (!args.hasOwnProperty('money')) {
+        return Promise.reject(new Error('simple.mix - \'money\' is missed in the arguments'));
+    }
+    if (!args.hasOwnProperty('weights')) {
+        return Promise.reject(new Error('simple.mix - \'weights\' is missed in the arguments'));
+    }
+    for (let operation in args.weights) {
+        if (OPERATIONS.indexOf(operation) < 0) {
+            return Promise.reject(new Error('simple.mix - unknown operation \'' + operation + '\''));
+        }
+    }
+    bc = blockchain;
+    contx = context;
+    initmoney = args.money;
+    weights = args.weights;
+    totalWeight = Object.keys(weights).reduce((sum, operation) => sum + weights[operation], 0);
+    account_array = open.account_array;
+    stats.start(args.round || 'mix');
+
+    return Promise.resolve();
+};
+
+/**
+ * Picks an operation with a probability proportional to its weight
+ * @returns {String} operation name
+ */
+function pickOperation() {
+    let value = Math.random() * totalWeight;
+    for (let operation in weights) {
+        value -= weights[operation];
+        if (value < 0) {
+            return operation;
+        }
+    }
+    return Object.keys(weights)[0];
+}
+
+/**
+ * Builds the arguments of a contract call
+ * @param {String} verb contract function
+ * @param {Array} values contract function arguments
+ * @returns {Object} arguments for the adapter
+ */
+function buildArgs(verb, values) {
+    if (bc.bcType === 'fabric') {
+        return {
+            chaincodeFunction: verb,
+            chaincodeArguments: values.map(value => value.toString()),
+        };
+    }
+    return {
+        verb: verb,
+        args: values
+    };
+}
+
+/**
+ * @returns {String} random account opened by the open round
+ */
+function randomAccount() {
+    return account_array[Math.floor(Math.random() * (account_array.length))];
+}
+
+/**
+ * Sends a transaction of the given type
+ * @param {String} operation transaction type
+ * @returns {Promise} result of the adapter call
+ */
+function send(operation) {
+    switch (operation) {
+    case 'open': {
+        // new accounts are never added to account_array so that the other operations keep hitting existing ones
+        const acc_id = 'mix' + process.pid + 'n' + (opened++);
+        return bc.invokeSmartContract(contx, 'simple', 'v0', buildArgs('open', [acc_id, initmoney]), 10);
+    }
+    case 'transfer':
+        return bc.invokeSmartContract(contx, 'simple', 'v0',
+            buildArgs('transfer', [randomAccount(), randomAccount(), initmoney]), 10);
+    case 'update':
+        return bc.invokeSmartContract(contx, 'simple', 'v0', buildArgs('open', [randomAccount(), initmoney]), 10);
+    default:
+        if (bc.bcType === 'fabric') {
+            return bc.bcObj.querySmartContract(contx, 'simple', 'v0', buildArgs('query', [randomAccount()]), 10);
+        }
+        // NOTE: the query API is not consistent with the invoke API
+        return bc.queryState(contx, 'simple', 'v0', randomAccount());
+    }
+}
+
+module.exports.run = function () {
+    const operation = pickOperation();
+    return stats.record(operation, send(operation));
+};
+
+module.exports.end = function () {
+    return stats.end();
+};
@@ -16,6 +16,8 @@
 
 module.exports.info  = 'opening accounts';
 
+const stats = require('./stats.js');
+
 let account_array = [];
 let txnPerBatch;
 let initMoney;
@@ -32,6 +34,7 @@ module.exports.init = function(blockchain, context, args) {
     txnPerBatch = args.txnPerBatch;
     bc = blockchain;
     contx = context;
+    stats.start(args.round || 'open');
 
     return Promise.resolve();
 };
@@ -97,11 +100,11 @@ function generateWorkload() {
 
 module.exports.run = function() {
     let args = generateWorkload();
-    return bc.invokeSmartContract(contx, 'simple', 'v0', args, 100);
+    return stats.record('open', bc.invokeSmartContract(contx, 'simple', 'v0', args, 100));
 };
 
 module.exports.end = function() {
-    return Promise.resolve();
+    return stats.end();
 };
 
 module.exports.account_array = account_array;
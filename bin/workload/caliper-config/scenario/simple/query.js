@@ -16,6 +16,8 @@
 
 module.exports.info  = 'querying accounts';
 
+const stats = require('./stats.js');
+
 
 let bc, contx;
 let account_array;
@@ -25,6 +27,7 @@ module.exports.init = function(blockchain, context, args) {
     bc       = blockchain;
     contx    = context;
     account_array = open.account_array;
+    stats.start(args.round || 'query');
 
     return Promise.resolve();
 };
@@ -38,14 +41,13 @@ module.exports.run = function() {
             chaincodeArguments: [acc],
         };
 
-        return bc.bcObj.querySmartContract(contx, 'simple', 'v0', args, 10);
+        return stats.record('query', bc.bcObj.querySmartContract(contx, 'simple', 'v0', args, 10));
     } else {
         // NOTE: the query API is not consistent with the invoke API
-        return bc.queryState(contx, 'simple', 'v0', acc);
+        return stats.record('query', bc.queryState(contx, 'simple', 'v0', acc));
     }
 };
 
 module.exports.end = function() {
-    // do nothing
-    return Promise.resolve();
+    return stats.end();
 };
@@ -0,0 +1,81 @@
+/*
+* Licensed under the Apache License, Version 2.0 (the "License");
+* you may not use this file except in compliance with the License.
+* You may obtain a copy of the License at
+*
+* http://www.apache.org/licenses/LICENSE-2.0
+*
+* Unless required by applicable law or agreed to in writing, software
+* distributed under the License is distributed on an "AS IS" BASIS,
+* WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+* See the License for the specific language governing permissions and
+* limitations under the License.
+*/
+
+'use strict';
+
+// Records what the callbacks actually sent, so run-caliper.py can measure the gas used by every round
+// from the receipts of the committed transactions instead of estimating it.
+
+const fs = require('fs');
+const path = require('path');
+
+const STATS_PATH = path.resolve(__dirname, '../../../caliper-stats');
+
+let round;
+let operations;
+let start;
+let end;
+
+/**
+ * Starts recording a round, called from the init of the callbacks
+ * @param {String} name round label, passed as 'round' in the arguments
+ */
+module.exports.start = function (name) {
+    round = name;
+    operations = {};
+    start = null;
+    end = null;
+};
+
+/**
+ * Records the transactions sent by a run of the callback
+ * @param {String} operation transaction type
+ * @param {Promise} promise result of the adapter call, a transaction status or an array of them
+ * @returns {Promise} the same result, so the callbacks can return it to caliper
+ */
+module.exports.record = function (operation, promise) {
+    if (!operations.hasOwnProperty(operation)) {
+        operations[operation] = {sent: 0, committed: 0, transactions: []};
+    }
+    const stats = operations[operation];
+    const sent = Date.now();
+    start = start === null ? sent : Math.min(start, sent);
+    return promise.then((result) => {
+        const statuses = Array.isArray(result) ? result : [result];
+        end = Math.max(end === null ? 0 : end, Date.now());
+        statuses.forEach((status) => {
+            stats.sent++;
+            if (status.IsCommitted()) {
+                stats.committed++;
+                // queries are not transactions, they have no hash
+                if (status.GetID()) {
+                    stats.transactions.push(status.GetID());
+                }
+            }
+        });
+        return result;
+    });
+};
+
+/**
+ * Saves the recorded round, called from the end of the callbacks
+ * @returns {Promise} resolved once the file is written
+ */
+module.exports.end = function () {
+    fs.mkdirSync(STATS_PATH, {recursive: true});
+    // every client process writes its own file
+    const file = path.join(STATS_PATH, round + '-' + process.pid + '.json');
+    fs.writeFileSync(file, JSON.stringify({round: round, start: start, end: end, operations: operations}));
+    return Promise.resolve();
+};
@@ -17,6 +17,8 @@
 
 module.exports.info = 'transfering money';
 
+const stats = require('./stats.js');
+
 let bc, contx;
 let account_array;
 let initmoney;
@@ -30,6 +32,7 @@ module.exports.init = function (blockchain, context, args) {
     contx = context;
     initmoney = args.money;
     account_array = open.account_array;
+    stats.start(args.round || 'transfer');
 
     return Promise.resolve();
 };
@@ -58,11 +61,10 @@ module.exports.run = function () {
         };
     }
 
-    return bc.invokeSmartContract(contx, 'simple', 'v0', args, 10);
+    return stats.record('transfer', bc.invokeSmartContract(contx, 'simple', 'v0', args, 10));
 
 };
 
 module.exports.end = function () {
-    // do nothing
-    return Promise.resolve();
+    return stats.end();
 };
@@ -1,6 +1,13 @@
 import json
 import os
+import glob
+import shutil
+import subprocess
+import tempfile
+import time
 import argparse
+import atexit
+import urllib.request
 
 CURRENT_FOLDER = os.path.dirname(os.path.abspath(__file__))
 
@@ -44,12 +51,152 @@ def update_json(filename, args):
     data["ethereum"]["fromAddress"] = "0x" + instance_data[2]
     data["ethereum"]["fromAddressPassword"] = instance_data[3].split('\n')[0]
 
-    with open('workload/caliper-config/networks/ethereum/1node-clique/ethereum.json', "w") as jsonFile:
+    with open(NETWORK_PATH, "w") as jsonFile:
         json.dump(data, jsonFile, indent=4)
 
 
 # get config for attempt
 CONFIG_PATH = os.path.join(_get_path('../../config'), 'config.json')
+NETWORK_PATH = "workload/caliper-config/networks/ethereum/1node-clique/ethereum.json"
+# transactions sent by every caliper client, written by the stats.js callback helper
+STATS_PATH = "workload/caliper-stats/"
+# receipts requested in every JSON-RPC batch
+RECEIPTS_BATCH = 100
+
+# benchmark configuration, paths relative to the caliper workspace (workload/)
+BENCHCONFIG = "caliper-config/scenario/simple/config.yaml"
+MIX_ROUND = """  - label: mix-{name}
+    description: Weighted mix of transactions {name}
+    txNumber:
+    - {txNumber}
+    rateControl:
+    - type: fixed-rate
+      opts:
+        tps: {tps}
+    arguments:
+      money: 100
+      weights: {weights}
+      round: mix-{name}
+    callback: caliper-config/scenario/simple/mix.js
+"""
+
+# Failure classes and the exit codes used to report them to main.py
+FAILURE_INFRASTRUCTURE = "infrastructure"
+FAILURE_NODE_NOT_SYNCED = "node_not_synced"
+FAILURE_CALIPER_CLIENT = "caliper_client"
+FAILURE_SUT_SATURATION = "sut_saturation"
+FAILURE_UNKNOWN = "unknown"
+FAILURE_EXIT_CODES = {
+    FAILURE_INFRASTRUCTURE: 10,
+    FAILURE_NODE_NOT_SYNCED: 11,
+    FAILURE_CALIPER_CLIENT: 12,
+    FAILURE_SUT_SATURATION: 13,
+    FAILURE_UNKNOWN: 1,
+}
+
+# Caliper output patterns for each failure class, checked in order. An overloaded node stops answering RPC calls
+# (timeouts, invalid responses) and the adapter prints stack traces of the failed calls, so saturation is checked
+# first and connection errors only match a node that is not reachable at all
+FAILURE_PATTERNS = (
+    (FAILURE_SUT_SATURATION, ('Transaction timeout', 'transaction timeout', 'txpool is full',
+                              'exceeds block gas limit', 'ETIMEDOUT', 'Invalid JSON RPC response')),
+    (FAILURE_INFRASTRUCTURE, ('ECONNREFUSED', 'EHOSTUNREACH', 'CONNECTION ERROR', 'authentication needed')),
+    (FAILURE_NODE_NOT_SYNCED, ('missing trie node', 'header not found', 'unknown block', 'still syncing',
+                               'No contract address')),
+    (FAILURE_CALIPER_CLIENT, ('Cannot find module', 'Client exited', 'Failed to init client',
+                              'replacement transaction underpriced', 'known transaction', 'nonce too low')),
+)
+
+
+def classify_failure(output):
+    for failure_type, patterns in FAILURE_PATTERNS:
+        if any(pattern in output for pattern in patterns):
+            return failure_type
+    return FAILURE_UNKNOWN
+
+
+# Failures retried here by running caliper again, any other class is reported at once to main.py, which deploys the
+# SUT again for infrastructure and sync failures and records saturation as a crash of the configuration
+RETRIED_FAILURES = (FAILURE_CALIPER_CLIENT, FAILURE_UNKNOWN)
+
+
+def get_failure_policy(config_general, failure_type):
+    # unclassified failures keep the original behaviour of retrying the configured number of attempts
+    if failure_type == FAILURE_UNKNOWN:
+        return {'retries': config_general['workload_config']['attempt'] - 1, 'backoff': 0}
+    return config_general['failure_policy'][failure_type]
+
+
+def create_benchconfig(workload_config):
+    # appends one round for every workload mix to the base benchmark configuration
+    mixes = workload_config.get('mixes', {})
+    if not mixes:
+        return BENCHCONFIG
+    with open("workload/" + BENCHCONFIG, 'r') as read_file:
+        benchconfig = read_file.read()
+    rounds = ''
+    for name, weights in sorted(mixes.items()):
+        rounds += MIX_ROUND.format(name=name, txNumber=workload_config['mixTxNumber'], tps=workload_config['mixTps'],
+                                   weights=json.dumps(weights))
+    position = benchconfig.index('\nmonitor:') + 1
+    # generated outside of the workspace, the callbacks are still relative to it
+    file, path = tempfile.mkstemp(prefix='config-mix-', suffix='.yaml')
+    with os.fdopen(file, 'w') as write_file:
+        write_file.write(benchconfig[:position] + rounds + benchconfig[position:])
+    return path
+
+
+def load_stats():
+    # merges the files of every caliper client, {round: {'start': ms, 'end': ms, 'operations': {...}}}
+    rounds = {}
+    for path in glob.glob(STATS_PATH + '*.json'):
+        with open(path) as f:
+            stats = json.load(f)
+        merged = rounds.setdefault(stats['round'], {'start': None, 'end': None, 'operations': {}})
+        if stats['start'] is not None:
+            merged['start'] = stats['start'] if merged['start'] is None else min(merged['start'], stats['start'])
+        if stats['end'] is not None:
+            merged['end'] = stats['end'] if merged['end'] is None else max(merged['end'], stats['end'])
+        for operation, values in stats['operations'].items():
+            merged_operation = merged['operations'].setdefault(operation, {'sent': 0, 'committed': 0,
+                                                                           'transactions': []})
+            for key in merged_operation:
+                merged_operation[key] += values[key]
+    return rounds
+
+
+def get_gas_used(url, transactions):
+    # total gas used by the transactions, read from their receipts with batched JSON-RPC calls
+    gas_used = 0
+    for start in range(0, len(transactions), RECEIPTS_BATCH):
+        batch = [{'jsonrpc': '2.0', 'id': i, 'method': 'eth_getTransactionReceipt', 'params': [transaction]}
+                 for i, transaction in enumerate(transactions[start:start + RECEIPTS_BATCH])]
+        request = urllib.request.Request(url, data=json.dumps(batch).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=60) as response:
+            for receipt in json.loads(response.read().decode('utf-8')):
+                if receipt.get('result'):
+                    gas_used += int(receipt['result']['gasUsed'], 16)
+    return gas_used
+
+
+def measure_rounds(url):
+    # transactions and gas per second of every round and transaction type, as measured on the SUT
+    measurement = {}
+    for name, stats in load_stats().items():
+        seconds = (stats['end'] - stats['start']) / 1000.0 if stats['start'] is not None else 0
+        operations = {}
+        for operation, values in stats['operations'].items():
+            gas_used = get_gas_used(url, values['transactions'])
+            operations[operation] = {'sent': values['sent'], 'committed': values['committed'], 'gasUsed': gas_used,
+                                     'throughput': values['committed'] / seconds if seconds else 0,
+                                     'gasPerSecond': gas_used / seconds if seconds else 0}
+        gas_used = sum(values['gasUsed'] for values in operations.values())
+        measurement[name] = {'seconds': seconds, 'sent': sum(values['sent'] for values in operations.values()),
+                             'committed': sum(values['committed'] for values in operations.values()),
+                             'gasUsed': gas_used, 'gasPerSecond': gas_used / seconds if seconds else 0,
+                             'operations': operations}
+    return measurement
 
 
 def main():
@@ -61,25 +208,49 @@ def main():
 
     # run the caliper
     config_general = load_config(CONFIG_PATH)
-    attempt = config_general['workload_config']['attempt']
     bashfile = "workload/run-caliper.sh"
+    benchconfig = create_benchconfig(config_general['workload_config'])
+    if benchconfig != BENCHCONFIG:
+        atexit.register(os.remove, benchconfig)
     reportname = config.interval + "seconds-" + config.gaslimit + ".html"
-    # running in number of attempts if it's failing (attempts variable getting from config)
-    for i in range(attempt):
+    # retrying only while the failure class allows it (policy getting from config)
+    retries = {}
+    while True:
+        # statistics of failed attempts must not be mixed with the next ones
+        shutil.rmtree(STATS_PATH, ignore_errors=True)
         # running run-caliper.sh with reportname
-        run_command = os.system("bash " + bashfile + " " + reportname)
-        if run_command == 0:
+        process = subprocess.Popen(["bash", bashfile, reportname, benchconfig], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, universal_newlines=True)
+        output, err_output = process.communicate()
+        print(output.strip())
+        if process.returncode == 0:
             print("Running caliper success.")
+            # the measured gas is saved next to the caliper report, the analyzers fall back to the configured
+            # gas per transaction if it is missing
+            try:
+                with open(NETWORK_PATH) as f:
+                    url = json.load(f)["ethereum"]["url"]
+                with open("workload/caliper-reports/" + reportname[:-len(".html")] + ".json", "w") as f:
+                    json.dump(measure_rounds(url), f, indent=4)
+            except Exception as e:
+                print("Failed to measure the gas used by the benchmark. Reason: %s" % e)
+            shutil.rmtree(STATS_PATH, ignore_errors=True)
             break
 
-        # if it reach the maximum attempt, printing error message
-        if i == attempt - 1:
-            print("Meet maximum retry. Running caliper error.")
-            # exit(-1)
-            raise Exception('Caliper execution failed ' + str(attempt) + ' times')
+        failure_type = classify_failure(err_output)
+        policy = get_failure_policy(config_general, failure_type)
+        retry = retries.get(failure_type, 0)
+        # if it reach the maximum retries for this failure class, printing error message
+        if failure_type not in RETRIED_FAILURES or retry >= policy['retries']:
+            print(err_output.strip())
+            print(("Meet maximum retry. " if failure_type in RETRIED_FAILURES else "") +
+                  "Running caliper error (" + failure_type + ").")
+            exit(FAILURE_EXIT_CODES[failure_type])
         else:
-            print("Caliper retrying...")
-            pass
+            backoff = policy['backoff'] * (2 ** retry)
+            retries[failure_type] = retry + 1
+            print("Caliper failed (" + failure_type + "), retrying in " + str(backoff) + " seconds...")
+            time.sleep(backoff)
     exit(0)
 
 
@@ -1,6 +1,7 @@
 #!/bin/sh
 
 REPORTNAME=${1}
+BENCHCONFIG=${2:-caliper-config/scenario/simple/config.yaml}
 
 #ADD BIND AS REQUIREMENT OR WE MUST DO A MAKEFILE DOING THIS COMMAND AFTER INSTALLING
 #pre-requisite installation
@@ -11,7 +12,7 @@ REPORTNAME=${1}
 #npx caliper bind --caliper-bind-sut ethereum --caliper-bind-sdk 1.2.1 --caliper-cwd ./ --caliper-bind-args="-g"
 npx caliper benchmark run \
     --caliper-workspace workload/ \
-    --caliper-benchconfig caliper-config/scenario/simple/config.yaml \
+    --caliper-benchconfig ${BENCHCONFIG} \
     --caliper-networkconfig caliper-config/networks/ethereum/1node-clique/ethereum.json \
     --caliper-report-path "caliper-reports/${REPORTNAME}" \
 > caliper-status.txt
@@ -25,8 +26,9 @@ then
     echo "Benchmark run successful"
     rm caliper-status.txt
 else
-    #delete report and return exit code
-    rm -r workload/caliper-reports/${REPORTNAME}
+    #forward caliper output so that the failure can be classified, delete report and return exit code
+    cat caliper-status.txt >&2
+    rm -rf workload/caliper-reports/${REPORTNAME}
     rm caliper-status.txt
     exit -1
 fi 